@@ -18,6 +18,7 @@ import asyncio
 import json
 import os
 import sys
+import threading
 import time
 from ftplib import FTP
 from pathlib import Path
@@ -37,6 +38,12 @@ FTP_OPERATION_DELAY = 0.5  # seconds between FTP operations
 FTP_RETRY_DELAY = 2.0      # seconds before retry after failure
 FTP_MAX_RETRIES = 2
 
+# Where to look for the Retro68 LaunchAPPL binary
+LAUNCHAPPL_CANDIDATES = [
+    os.path.expanduser("~/Retro68-build/toolchain/bin/LaunchAPPL"),
+    "/opt/Retro68-build/toolchain/bin/LaunchAPPL",
+]
+
 
 class ClassicMacHardwareServer:
     """MCP Server for Classic Mac hardware access via FTP and LaunchAPPL."""
@@ -48,10 +55,26 @@ class ClassicMacHardwareServer:
         self._config_mtime = 0
         self._first_load = True
         self._last_ftp_time = 0  # For rate limiting
+        self._rate_lock = threading.Lock()
+        self._machine_locks = {}  # machine_id -> Lock, one operation per Mac
+        self._machine_locks_guard = threading.Lock()
+        self._launchappl = None  # Resolved on first successful lookup
+        self._log_names = {}  # machine_id -> PT_Log filename that worked last
         self._reload_if_changed()
         self._first_load = False
         self.server = Server("classic-mac-hardware")
 
+        # Tool name -> handler, looked up once per call_tool
+        self._tool_handlers = {
+            "list_machines": self._tool_list_machines,
+            "test_connection": self._tool_test_connection,
+            "list_directory": self._tool_list_directory,
+            "delete_files": self._tool_delete_files,
+            "upload_file": self._tool_upload_file,
+            "download_file": self._tool_download_file,
+            "execute_binary": self._tool_execute_binary,
+        }
+
         # Register handlers
         self.server.list_resources()(self.list_resources)
         self.server.read_resource()(self.read_resource)
@@ -100,11 +123,31 @@ class ClassicMacHardwareServer:
     # =========================================================================
 
     def _rate_limit(self):
-        """Wait if needed to avoid overwhelming RumpusFTP."""
-        elapsed = time.time() - self._last_ftp_time
-        if elapsed < FTP_OPERATION_DELAY:
-            time.sleep(FTP_OPERATION_DELAY - elapsed)
-        self._last_ftp_time = time.time()
+        """Wait if needed to avoid overwhelming RumpusFTP.
+
+        Tools run on worker threads, so the lock keeps FTP connection
+        attempts spaced out even when several tool calls arrive at once.
+        Whole operations are serialized per machine by _machine_lock().
+        """
+        with self._rate_lock:
+            elapsed = time.time() - self._last_ftp_time
+            if elapsed < FTP_OPERATION_DELAY:
+                time.sleep(FTP_OPERATION_DELAY - elapsed)
+            self._last_ftp_time = time.time()
+
+    def _machine_lock(self, machine_id: str) -> threading.Lock:
+        """
+        Get the lock that serializes network access to one machine.
+
+        Tools run on worker threads, so every FTP session, LaunchAPPL run
+        and connection probe takes this lock; otherwise two calls could
+        talk to the same old Mac at once.
+        """
+        with self._machine_locks_guard:
+            lock = self._machine_locks.get(machine_id)
+            if lock is None:
+                lock = self._machine_locks[machine_id] = threading.Lock()
+            return lock
 
     def _connect_ftp(self, machine_id: str) -> FTP:
         """Create FTP connection with rate limiting."""
@@ -135,22 +178,25 @@ class ClassicMacHardwareServer:
         Returns:
             Result from operation
         """
+        self._validate_machine_id(machine_id)
+
         last_error = None
-        for attempt in range(FTP_MAX_RETRIES):
-            try:
-                ftp = self._connect_ftp(machine_id)
+        with self._machine_lock(machine_id):
+            for attempt in range(FTP_MAX_RETRIES):
                 try:
-                    result = operation(ftp, *args, **kwargs)
-                    return result
-                finally:
+                    ftp = self._connect_ftp(machine_id)
                     try:
-                        ftp.quit()
-                    except:
-                        pass
-            except Exception as e:
-                last_error = e
-                if attempt < FTP_MAX_RETRIES - 1:
-                    time.sleep(FTP_RETRY_DELAY)
+                        result = operation(ftp, *args, **kwargs)
+                        return result
+                    finally:
+                        try:
+                            ftp.quit()
+                        except:
+                            pass
+                except Exception as e:
+                    last_error = e
+                    if attempt < FTP_MAX_RETRIES - 1:
+                        time.sleep(FTP_RETRY_DELAY)
 
         raise last_error
 
@@ -237,18 +283,27 @@ class ClassicMacHardwareServer:
         resource_type = parts[1] if len(parts) > 1 else ''
 
         if resource_type == "logs":
-            return self._fetch_log_via_download(machine_id)
+            return await asyncio.to_thread(self._fetch_log_via_download, machine_id)
         else:
             raise ValueError(f"Unknown resource type: {resource_type}")
 
     def _fetch_log_via_download(self, machine_id: str) -> str:
         """Fetch PT_Log content from machine using FTP."""
+        log_names = ["PT_Log", "pt_log", "PT_Log.txt"]
+
+        # Try the name that worked last time first to skip failed RETRs
+        known = self._log_names.get(machine_id)
+        if known:
+            log_names.remove(known)
+            log_names.insert(0, known)
+
         def operation(ftp):
-            for log_name in ["PT_Log", "pt_log", "PT_Log.txt"]:
+            for log_name in log_names:
                 try:
                     lines = []
                     ftp.retrlines(f'RETR {log_name}', lines.append)
                     if lines:
+                        self._log_names[machine_id] = log_name
                         return '\n'.join(lines)
                 except:
                     pass
@@ -352,27 +407,21 @@ class ClassicMacHardwareServer:
         """Execute tool."""
         self._reload_if_changed()
 
+        # FTP, sockets and LaunchAPPL all block; run them off the event loop
+        # so the stdio transport keeps servicing requests meanwhile.
         try:
-            if name == "list_machines":
-                return self._tool_list_machines()
-            elif name == "test_connection":
-                return self._tool_test_connection(arguments)
-            elif name == "list_directory":
-                return self._tool_list_directory(arguments)
-            elif name == "delete_files":
-                return self._tool_delete_files(arguments)
-            elif name == "upload_file":
-                return self._tool_upload_file(arguments)
-            elif name == "download_file":
-                return self._tool_download_file(arguments)
-            elif name == "execute_binary":
-                return self._tool_execute_binary(arguments)
-            else:
-                raise ValueError(f"Unknown tool: {name}")
+            return await asyncio.to_thread(self._dispatch_tool, name, arguments)
         except Exception as e:
             return [TextContent(type="text", text=f"Error: {str(e)}")]
 
-    def _tool_list_machines(self) -> list[TextContent]:
+    def _dispatch_tool(self, name: str, arguments: dict) -> list[TextContent]:
+        """Run the named tool synchronously."""
+        handler = self._tool_handlers.get(name)
+        if handler is None:
+            raise ValueError(f"Unknown tool: {name}")
+        return handler(arguments)
+
+    def _tool_list_machines(self, args: dict) -> list[TextContent]:
         """List all configured machines."""
         if not self.machines:
             return [TextContent(type="text", text="No machines configured.\nEdit machines.json to add Classic Macs.")]
@@ -408,39 +457,42 @@ class ClassicMacHardwareServer:
 
         results = []
 
-        # Test FTP only if configured
-        if 'ftp' in machine:
-            try:
-                ftp = self._connect_ftp(machine_id)
-                pwd = ftp.pwd()
-                ftp.quit()
-                results.append(f"FTP: Connected (root: {pwd})")
-            except Exception as e:
-                results.append(f"FTP: FAILED - {str(e)}")
-        else:
-            results.append("FTP: Not configured")
+        # Hold the machine lock for both probes so neither overlaps an
+        # upload or a running execute_binary on the same Mac
+        with self._machine_lock(machine_id):
+            # Test FTP only if configured
+            if 'ftp' in machine:
+                try:
+                    ftp = self._connect_ftp(machine_id)
+                    pwd = ftp.pwd()
+                    ftp.quit()
+                    results.append(f"FTP: Connected (root: {pwd})")
+                except Exception as e:
+                    results.append(f"FTP: FAILED - {str(e)}")
+            else:
+                results.append("FTP: Not configured")
 
-        # Test LaunchAPPL if configured or explicitly requested
-        if 'launchappl' in machine or args.get("test_launchappl"):
-            import socket
-            try:
-                la_config = machine.get('launchappl', {})
-                host = la_config.get('host') or machine.get('ftp', {}).get('host')
-                port = la_config.get('port', 1984)
-
-                if not host:
-                    results.append("LaunchAPPL: No host configured")
-                else:
-                    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-                    sock.settimeout(2)
-                    result = sock.connect_ex((host, port))
-                    sock.close()
-                    if result == 0:
-                        results.append(f"LaunchAPPL: Port {port} open")
+            # Test LaunchAPPL if configured or explicitly requested
+            if 'launchappl' in machine or args.get("test_launchappl"):
+                import socket
+                try:
+                    la_config = machine.get('launchappl', {})
+                    host = la_config.get('host') or machine.get('ftp', {}).get('host')
+                    port = la_config.get('port', 1984)
+
+                    if not host:
+                        results.append("LaunchAPPL: No host configured")
                     else:
-                        results.append(f"LaunchAPPL: Port {port} not responding")
-            except Exception as e:
-                results.append(f"LaunchAPPL: FAILED - {str(e)}")
+                        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+                        sock.settimeout(2)
+                        result = sock.connect_ex((host, port))
+                        sock.close()
+                        if result == 0:
+                            results.append(f"LaunchAPPL: Port {port} open")
+                        else:
+                            results.append(f"LaunchAPPL: Port {port} not responding")
+                except Exception as e:
+                    results.append(f"LaunchAPPL: FAILED - {str(e)}")
 
         return [TextContent(
             type="text",
@@ -618,6 +670,15 @@ class ClassicMacHardwareServer:
                  f"  Size:   {file_size:,} bytes"
         )]
 
+    def _find_launchappl(self):
+        """Locate LaunchAPPL once; keep searching on later calls until found."""
+        if self._launchappl is None:
+            for candidate in LAUNCHAPPL_CANDIDATES:
+                if os.path.exists(candidate):
+                    self._launchappl = candidate
+                    break
+        return self._launchappl
+
     def _tool_execute_binary(self, args: dict) -> list[TextContent]:
         """Execute binary via LaunchAPPL."""
         import subprocess
@@ -628,20 +689,10 @@ class ClassicMacHardwareServer:
         self._validate_machine_id(machine_id)
         machine = self.machines[machine_id]
 
-        # Find LaunchAPPL binary - check common locations
-        launchappl = None
-        candidates = [
-            os.path.expanduser("~/Retro68-build/toolchain/bin/LaunchAPPL"),
-            "/opt/Retro68-build/toolchain/bin/LaunchAPPL",
-        ]
-        for candidate in candidates:
-            if os.path.exists(candidate):
-                launchappl = candidate
-                break
-
+        launchappl = self._find_launchappl()
         if not launchappl:
             return [TextContent(type="text", text=f"LaunchAPPL not found. Checked:\n" +
-                               "\n".join(f"  - {c}" for c in candidates))]
+                               "\n".join(f"  - {c}" for c in LAUNCHAPPL_CANDIDATES))]
 
         if not binary_path or not Path(binary_path).exists():
             return [TextContent(type="text", text=f"Binary not found: {binary_path}")]
@@ -657,19 +708,20 @@ class ClassicMacHardwareServer:
 
         try:
             cmd = [launchappl, "-e", "tcp", "--tcp-address", machine_ip, binary_path]
-            proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
-                                    text=True, cwd="/tmp")
-            try:
-                stdout, stderr = proc.communicate(timeout=120)
-            except subprocess.TimeoutExpired:
-                proc.kill()
-                proc.wait()
-                return [TextContent(
-                    type="text",
-                    text=f"Timed out after 120s. Binary may still be running on {machine['name']}.\n"
-                         f"Download logs via FTP when the test completes:\n"
-                         f"  download_file(machine=\"{machine_id}\", remote_path=\"PT_Log\")"
-                )]
+            with self._machine_lock(machine_id):
+                proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                                        text=True, cwd="/tmp")
+                try:
+                    stdout, stderr = proc.communicate(timeout=120)
+                except subprocess.TimeoutExpired:
+                    proc.kill()
+                    proc.wait()
+                    return [TextContent(
+                        type="text",
+                        text=f"Timed out after 120s. Binary may still be running on {machine['name']}.\n"
+                             f"Download logs via FTP when the test completes:\n"
+                             f"  download_file(machine=\"{machine_id}\", remote_path=\"PT_Log\")"
+                    )]
 
             if proc.returncode == 0:
                 return [TextContent(type="text", text=f"Executed on {machine['name']}:\n\n{stdout}")]
@@ -86,23 +86,10 @@ int handle_send_command(app_state_t *state, const char *args)
     msg_start++;
 
     /* Convert 1-based peer_num to 0-based connected peer index */
-    int connected_idx = 0;
-    int found = 0;
-    int total = PT_GetPeerCount(state->pt_ctx);
-    int i;
-    for (i = 0; i < total; i++) {
-        PT_Peer *p = PT_GetPeer(state->pt_ctx, i);
-        if (p && PT_GetPeerState(p) == PT_PEER_CONNECTED) {
-            connected_idx++;
-            if (connected_idx == peer_num) {
-                bridge_queue_send(i, msg_start);
-                found = 1;
-                break;
-            }
-        }
-    }
-
-    if (!found) {
+    int peer_index = bridge_find_connected_peer(state, peer_num - 1);
+    if (peer_index >= 0) {
+        bridge_queue_send(peer_index, msg_start);
+    } else {
         if (state->ui) {
             UI_CALL(state->ui, notify_send_result, 0, peer_num, NULL);
         }
@@ -87,6 +87,7 @@ int main(int argc, char const * const argv[])
     CLOG_INFO("Discovery started for '%s'", state.username);
 
     /* Start input thread */
+    input_wakeup_init();
     if (pthread_create(&input_tid, NULL, user_input_thread, &state) != 0) {
         fprintf(stderr, "Failed to create input thread\n");
         PT_Shutdown(state.pt_ctx);
@@ -106,6 +107,7 @@ int main(int argc, char const * const argv[])
     /* Clean shutdown */
     CLOG_INFO("Shutting down...");
 
+    input_wakeup_signal();
     pthread_join(input_tid, NULL);
 
     PT_Shutdown(state.pt_ctx);
@@ -18,26 +18,74 @@ static pthread_mutex_t cmd_mutex = PTHREAD_MUTEX_INITIALIZER;
 /* Application state reference for callbacks */
 static app_state_t *g_bridge_state = NULL;
 
-/* Reconnection backoff — track last disconnect time per peer IP */
+/*
+ * Reconnection backoff — track last disconnect time per peer IP.
+ * Peers that drop again (other than by quitting) within
+ * RECONNECT_STABLE_SECS of connecting have their cooldown doubled, up to a
+ * cap; each stable period a connection lasts earns one step back.
+ */
 #define RECONNECT_COOLDOWN_SECS 5
+#define RECONNECT_MAX_STRIKES 4     /* caps the cooldown at 5 << 4 = 80s */
+#define RECONNECT_STABLE_SECS 60
 #define MAX_TRACKED_PEERS 32
 
 static struct {
     char ip[48];
     time_t disconnect_time;
+    time_t connect_time;    /* 0 until connected again after disconnect_time */
+    int strikes;
 } disconnect_tracker[MAX_TRACKED_PEERS];
 
-static void track_disconnect(const char *ip)
+static time_t reconnect_cooldown(int strikes)
+{
+    return (time_t)RECONNECT_COOLDOWN_SECS << strikes;
+}
+
+static void track_connect(const char *ip)
+{
+    int i;
+    for (i = 0; i < MAX_TRACKED_PEERS; i++) {
+        if (strcmp(disconnect_tracker[i].ip, ip) == 0) {
+            disconnect_tracker[i].connect_time = time(NULL);
+            return;
+        }
+    }
+}
+
+static void track_disconnect(const char *ip, PT_DisconnectReason reason)
 {
     int i, oldest = 0;
     time_t oldest_time = 0;
+    time_t now = time(NULL);
 
     for (i = 0; i < MAX_TRACKED_PEERS; i++) {
-        if (disconnect_tracker[i].ip[0] == '\0' ||
-            strcmp(disconnect_tracker[i].ip, ip) == 0) {
+        if (disconnect_tracker[i].ip[0] == '\0') {
             strncpy(disconnect_tracker[i].ip, ip, 47);
             disconnect_tracker[i].ip[47] = '\0';
-            disconnect_tracker[i].disconnect_time = time(NULL);
+            disconnect_tracker[i].disconnect_time = now;
+            disconnect_tracker[i].connect_time = 0;
+            disconnect_tracker[i].strikes = 0;
+            return;
+        }
+        if (strcmp(disconnect_tracker[i].ip, ip) == 0) {
+            /* Judge by how long the connection itself lasted */
+            if (disconnect_tracker[i].connect_time != 0) {
+                time_t uptime = now - disconnect_tracker[i].connect_time;
+                if (uptime < RECONNECT_STABLE_SECS) {
+                    if (reason != PT_QUIT &&
+                        disconnect_tracker[i].strikes < RECONNECT_MAX_STRIKES) {
+                        disconnect_tracker[i].strikes++;
+                    }
+                } else {
+                    int recovered = (int)(uptime / RECONNECT_STABLE_SECS);
+                    disconnect_tracker[i].strikes -= recovered;
+                    if (disconnect_tracker[i].strikes < 0) {
+                        disconnect_tracker[i].strikes = 0;
+                    }
+                }
+            }
+            disconnect_tracker[i].disconnect_time = now;
+            disconnect_tracker[i].connect_time = 0;
             return;
         }
         if (oldest_time == 0 || disconnect_tracker[i].disconnect_time < oldest_time) {
@@ -48,7 +96,9 @@ static void track_disconnect(const char *ip)
     /* Evict oldest */
     strncpy(disconnect_tracker[oldest].ip, ip, 47);
     disconnect_tracker[oldest].ip[47] = '\0';
-    disconnect_tracker[oldest].disconnect_time = time(NULL);
+    disconnect_tracker[oldest].disconnect_time = now;
+    disconnect_tracker[oldest].connect_time = 0;
+    disconnect_tracker[oldest].strikes = 0;
 }
 
 static int should_reconnect(const char *ip)
@@ -57,8 +107,9 @@ static int should_reconnect(const char *ip)
     time_t now = time(NULL);
     for (i = 0; i < MAX_TRACKED_PEERS; i++) {
         if (strcmp(disconnect_tracker[i].ip, ip) == 0) {
-            if (now - disconnect_tracker[i].disconnect_time < RECONNECT_COOLDOWN_SECS) {
-                CLOG_INFO("Skipping reconnect to %s (cooldown)", ip);
+            time_t cooldown = reconnect_cooldown(disconnect_tracker[i].strikes);
+            if (now - disconnect_tracker[i].disconnect_time < cooldown) {
+                CLOG_INFO("Skipping reconnect to %s (cooldown %lds)", ip, (long)cooldown);
                 return 0;
             }
             return 1;
@@ -96,6 +147,7 @@ static void on_connected(PT_Peer *peer, void *user_data)
 {
     app_state_t *state = (app_state_t *)user_data;
     CLOG_INFO("Connected to peer: %s (%s)", PT_PeerName(peer), PT_PeerAddress(peer));
+    track_connect(PT_PeerAddress(peer));
     if (state->ui) {
         UI_CALL(state->ui, notify_peer_update);
     }
@@ -118,7 +170,7 @@ static void on_disconnected(PT_Peer *peer, PT_DisconnectReason reason, void *use
     }
     CLOG_INFO("Disconnected from peer: %s (%s) reason=%s",
               PT_PeerName(peer), PT_PeerAddress(peer), reason_str);
-    track_disconnect(PT_PeerAddress(peer));
+    track_disconnect(PT_PeerAddress(peer), reason);
     if (state->ui) {
         UI_CALL(state->ui, notify_peer_update);
     }
@@ -200,49 +252,49 @@ void bridge_queue_broadcast(const char *msg)
 
 void bridge_process_queue(app_state_t *state)
 {
-    while (cmd_tail != cmd_head) {
-        pending_command_t cmd;
-        pthread_mutex_lock(&cmd_mutex);
-        if (cmd_tail == cmd_head) {
-            pthread_mutex_unlock(&cmd_mutex);
-            break;
-        }
-        cmd = cmd_queue[cmd_tail];
-        cmd_tail = (cmd_tail + 1) % CMD_QUEUE_SIZE;
-        pthread_mutex_unlock(&cmd_mutex);
+    int head, tail;
 
-        switch (cmd.type) {
+    if (cmd_tail == cmd_head) {
+        return;
+    }
+
+    /*
+     * Drain everything queued so far in one batch: snapshot the head once,
+     * work on the slots in place, then publish the new tail once. The
+     * producer never writes a slot between tail and head, so they are
+     * stable until the tail is released below.
+     */
+    pthread_mutex_lock(&cmd_mutex);
+    head = cmd_head;
+    tail = cmd_tail;
+    pthread_mutex_unlock(&cmd_mutex);
+
+    for (; tail != head; tail = (tail + 1) % CMD_QUEUE_SIZE) {
+        const pending_command_t *cmd = &cmd_queue[tail];
+
+        switch (cmd->type) {
         case CMD_SEND: {
-            PT_Peer *peer = PT_GetPeer(state->pt_ctx, cmd.peer_index);
+            PT_Peer *peer = PT_GetPeer(state->pt_ctx, cmd->peer_index);
             if (peer && PT_GetPeerState(peer) == PT_PEER_CONNECTED) {
                 PT_Status st = PT_Send(state->pt_ctx, peer, MSG_CHAT,
-                                       cmd.message, strlen(cmd.message));
+                                       cmd->message, strlen(cmd->message));
                 if (state->ui) {
                     UI_CALL(state->ui, notify_send_result,
                             st == PT_OK ? 1 : 0,
-                            cmd.peer_index + 1,
+                            cmd->peer_index + 1,
                             PT_PeerAddress(peer));
                 }
             } else {
                 if (state->ui) {
-                    UI_CALL(state->ui, notify_send_result, 0, cmd.peer_index + 1, "");
+                    UI_CALL(state->ui, notify_send_result, 0, cmd->peer_index + 1, "");
                 }
             }
             break;
         }
         case CMD_BROADCAST: {
             PT_Status st = PT_Broadcast(state->pt_ctx, MSG_CHAT,
-                                        cmd.message, strlen(cmd.message));
-            int count = 0;
-            if (st == PT_OK) {
-                int i, total = PT_GetPeerCount(state->pt_ctx);
-                for (i = 0; i < total; i++) {
-                    PT_Peer *p = PT_GetPeer(state->pt_ctx, i);
-                    if (p && PT_GetPeerState(p) == PT_PEER_CONNECTED) {
-                        count++;
-                    }
-                }
-            }
+                                        cmd->message, strlen(cmd->message));
+            int count = (st == PT_OK) ? bridge_get_peer_count(state) : 0;
             if (state->ui) {
                 UI_CALL(state->ui, notify_broadcast_result, count);
             }
@@ -253,6 +305,10 @@ void bridge_process_queue(app_state_t *state)
             break;
         }
     }
+
+    pthread_mutex_lock(&cmd_mutex);
+    cmd_tail = tail;
+    pthread_mutex_unlock(&cmd_mutex);
 }
 
 int bridge_get_peer_count(app_state_t *state)
@@ -267,3 +323,19 @@ int bridge_get_peer_count(app_state_t *state)
     }
     return count;
 }
+
+int bridge_find_connected_peer(app_state_t *state, int connected_index)
+{
+    int connected = 0;
+    int i, total = PT_GetPeerCount(state->pt_ctx);
+    for (i = 0; i < total; i++) {
+        PT_Peer *p = PT_GetPeer(state->pt_ctx, i);
+        if (p && PT_GetPeerState(p) == PT_PEER_CONNECTED) {
+            if (connected == connected_index) {
+                return i;
+            }
+            connected++;
+        }
+    }
+    return -1;
+}
@@ -30,4 +30,7 @@ void bridge_process_queue(app_state_t *state);
 /* Peer info helpers (wrapping PT_GetPeer*) */
 int bridge_get_peer_count(app_state_t *state);
 
+/* Map a 0-based connected peer index to a PeerTalk peer index (-1 if none) */
+int bridge_find_connected_peer(app_state_t *state, int connected_index);
+
 #endif
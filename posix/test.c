@@ -33,23 +33,19 @@ static int test_get_peer_info(int index, char *name_buf, size_t name_size,
                               char *addr_buf, size_t addr_size, void *context)
 {
     app_state_t *state = (app_state_t *)context;
-    int i, total, connected = 0;
+    PT_Peer *p;
+    int peer_index = bridge_find_connected_peer(state, index);
 
-    total = PT_GetPeerCount(state->pt_ctx);
-    for (i = 0; i < total; i++) {
-        PT_Peer *p = PT_GetPeer(state->pt_ctx, i);
-        if (p && PT_GetPeerState(p) == PT_PEER_CONNECTED) {
-            if (connected == index) {
-                strncpy(name_buf, PT_PeerName(p), name_size - 1);
-                name_buf[name_size - 1] = '\0';
-                strncpy(addr_buf, PT_PeerAddress(p), addr_size - 1);
-                addr_buf[addr_size - 1] = '\0';
-                return 0;
-            }
-            connected++;
-        }
+    if (peer_index < 0) {
+        return -1;
     }
-    return -1;
+
+    p = PT_GetPeer(state->pt_ctx, peer_index);
+    strncpy(name_buf, PT_PeerName(p), name_size - 1);
+    name_buf[name_size - 1] = '\0';
+    strncpy(addr_buf, PT_PeerAddress(p), addr_size - 1);
+    addr_buf[addr_size - 1] = '\0';
+    return 0;
 }
 
 void run_posix_automated_test(app_state_t *state)
@@ -10,6 +10,7 @@
 #include <unistd.h>
 #include <errno.h>
 #include <ctype.h>
+#include <stdarg.h>
 
 /* Command table */
 static const command_entry_t command_table[] = {
@@ -28,6 +29,28 @@ static const command_entry_t command_table[] = {
     {NULL, NULL, NULL}
 };
 
+/* Self-pipe used to wake the input thread on shutdown instead of polling */
+static int wakeup_pipe[2] = {-1, -1};
+
+int input_wakeup_init(void)
+{
+    if (pipe(wakeup_pipe) != 0) {
+        CLOG_WARN("Failed to create input wakeup pipe, falling back to polling");
+        wakeup_pipe[0] = wakeup_pipe[1] = -1;
+        return -1;
+    }
+    return 0;
+}
+
+void input_wakeup_signal(void)
+{
+    /* Closing the write end makes the read end readable (EOF) */
+    if (wakeup_pipe[1] >= 0) {
+        close(wakeup_pipe[1]);
+        wakeup_pipe[1] = -1;
+    }
+}
+
 static const command_entry_t *find_command(const char *cmd_name)
 {
     const command_entry_t *cmd;
@@ -118,66 +141,149 @@ command_complete:
     return result;
 }
 
+static void report_input_error(app_state_t *state, const char *format, ...)
+{
+    va_list args;
+    if (!state->ui) return;
+    va_start(args, format);
+    UI_CALL_VA(state->ui, display_error, format, args);
+    va_end(args);
+}
+
+/* Reject a line handle_command() could only accept by truncating it */
+static void reject_long_line(app_state_t *state)
+{
+    CLOG_WARN("Input line longer than %d bytes rejected", BUFFER_SIZE - 1);
+    report_input_error(state, "Input line too long (max %d characters), ignored",
+                       BUFFER_SIZE - 1);
+    if (state->ui) {
+        UI_CALL(state->ui, show_prompt);
+    }
+}
+
+/* Run one complete input line; returns 1 if the thread should stop */
+static int process_input_line(app_state_t *state, char *line)
+{
+    line[strcspn(line, "\n")] = '\0';
+    if (strlen(line) == 0) {
+        if (state->ui) {
+            UI_CALL(state->ui, show_prompt);
+        }
+        return 0;
+    }
+
+    if (handle_command(state, line) == 1) {
+        return 1;
+    }
+
+    if (state->ui) {
+        UI_CALL(state->ui, show_prompt);
+    }
+    return 0;
+}
+
 void *user_input_thread(void *arg)
 {
     app_state_t *state = (app_state_t *)arg;
-    char input[BUFFER_SIZE];
+    /* Room for several lines so one read() can deliver a burst of commands */
+    char input[BUFFER_SIZE * 4];
+    size_t buffered = 0;
+    int stop = 0;
+    int discarding = 0;     /* inside an overlong line, waiting for its newline */
     fd_set readfds;
     struct timeval timeout;
+    int wake_fd = wakeup_pipe[0];
+    int max_fd = wake_fd > STDIN_FILENO ? wake_fd : STDIN_FILENO;
 
     if (state->ui) {
         UI_CALL(state->ui, notify_ready);
         UI_CALL(state->ui, show_prompt);
     }
 
-    while (state->running) {
+    while (state->running && !stop) {
+        ssize_t n;
+        size_t line_start;
+        char *newline;
+
         FD_ZERO(&readfds);
         FD_SET(STDIN_FILENO, &readfds);
+        if (wake_fd >= 0) {
+            FD_SET(wake_fd, &readfds);
+        }
         timeout.tv_sec = 1;
         timeout.tv_usec = 0;
 
-        int activity = select(STDIN_FILENO + 1, &readfds, NULL, NULL, &timeout);
+        /* Block until input or shutdown; only poll if the wakeup pipe is missing */
+        int activity = select(max_fd + 1, &readfds, NULL, NULL,
+                              wake_fd >= 0 ? NULL : &timeout);
         if (activity < 0) {
             if (errno == EINTR) continue;
             break;
         }
         if (!state->running) break;
         if (activity == 0) continue;
+        if (wake_fd >= 0 && FD_ISSET(wake_fd, &readfds)) break;
 
-        if (fgets(input, BUFFER_SIZE, stdin) == NULL) {
-            if (state->running) {
-                if (feof(stdin)) {
-                    CLOG_INFO("EOF on stdin, shutting down");
-                    if (g_state) g_state->running = 0;
-                    else state->running = 0;
-                } else if (errno == EINTR) {
-                    continue;
-                } else {
-                    clearerr(stdin);
-                    usleep(100000);
-                    continue;
-                }
+        /*
+         * Read straight from the fd rather than through stdio: fgets() would
+         * pull several queued lines into the FILE buffer and return only the
+         * first, leaving the rest stranded until select() saw new input.
+         */
+        n = read(STDIN_FILENO, input + buffered, sizeof(input) - 1 - buffered);
+        if (n < 0) {
+            if (errno == EINTR || errno == EAGAIN) continue;
+            usleep(100000);
+            continue;
+        }
+        if (n == 0) {
+            /* Handle a final unterminated line, as fgets() used to */
+            if (buffered > 0 && !discarding) {
+                input[buffered] = '\0';
+                process_input_line(state, input);
             }
+            CLOG_INFO("EOF on stdin, shutting down");
+            if (g_state) g_state->running = 0;
+            else state->running = 0;
             break;
         }
+        buffered += (size_t)n;
 
-        input[strcspn(input, "\n")] = '\0';
-        if (strlen(input) == 0) {
-            if (state->ui) {
-                UI_CALL(state->ui, show_prompt);
+        line_start = 0;
+        while (!stop &&
+               (newline = memchr(input + line_start, '\n', buffered - line_start)) != NULL) {
+            size_t line_len = (size_t)(newline - (input + line_start));
+            *newline = '\0';
+            if (discarding) {
+                /* Tail of a line already rejected */
+                discarding = 0;
+            } else if (line_len > BUFFER_SIZE - 1) {
+                reject_long_line(state);
+            } else {
+                stop = process_input_line(state, input + line_start);
             }
-            continue;
+            line_start = (size_t)(newline - input) + 1;
         }
 
-        if (handle_command(state, input) == 1) {
-            break;
+        if (line_start > 0) {
+            buffered -= line_start;
+            memmove(input, input + line_start, buffered);
         }
 
-        if (state->ui) {
-            UI_CALL(state->ui, show_prompt);
+        /* Partial line already too long: report it once, drop until newline */
+        if (discarding) {
+            buffered = 0;
+        } else if (buffered > BUFFER_SIZE - 1) {
+            reject_long_line(state);
+            discarding = 1;
+            buffered = 0;
         }
     }
 
+    if (wake_fd >= 0) {
+        close(wake_fd);
+        wakeup_pipe[0] = -1;
+    }
+
     CLOG_INFO("Input thread stopped");
     return NULL;
 }
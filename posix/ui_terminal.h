@@ -6,4 +6,8 @@
 void *user_input_thread(void *arg);
 int handle_command(app_state_t *state, const char *input);
 
+/* Shutdown wakeup for the input thread (init before starting it) */
+int input_wakeup_init(void);
+void input_wakeup_signal(void);
+
 #endif
@@ -78,17 +78,21 @@ static void interactive_display_peer_list(void *context, app_state_t *state)
     fflush(stdout);
 }
 
+/* Help text is fixed, so build it once at compile time */
+static const char help_text[] =
+    "\nCommands:\n"
+    "  /list                     - List all active peers\n"
+    "  /send <peer_number> <msg> - Send <msg> to a specific peer\n"
+    "  /broadcast <message>      - Send <message> to all active peers\n"
+    "  /debug                    - Toggle debug output\n"
+    "  /test                     - Run automated test sequence\n"
+    "  /quit                     - Exit the application\n"
+    "  /help                     - Show this help message\n\n";
+
 static void interactive_display_help(void *context)
 {
     (void)context;
-    printf("\nCommands:\n");
-    printf("  /list                     - List all active peers\n");
-    printf("  /send <peer_number> <msg> - Send <msg> to a specific peer\n");
-    printf("  /broadcast <message>      - Send <message> to all active peers\n");
-    printf("  /debug                    - Toggle debug output\n");
-    printf("  /test                     - Run automated test sequence\n");
-    printf("  /quit                     - Exit the application\n");
-    printf("  /help                     - Show this help message\n\n");
+    fputs(help_text, stdout);
     fflush(stdout);
 }
 
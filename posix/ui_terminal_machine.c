@@ -1,6 +1,7 @@
 #include "ui_interface.h"
 #include "ui_factory.h"
 #include "peertalk_bridge.h"
+#include "commands.h"
 #include "clog.h"
 #include "../shared/common_defs.h"
 #include <stdio.h>
@@ -51,30 +52,37 @@ static void json_output(const char *json)
     pthread_mutex_unlock(&output_mutex);
 }
 
+/* Escape a string for a JSON string literal, truncating cleanly if dest is full */
 static void json_escape(char *dest, const char *src, size_t dest_size)
 {
-    size_t i = 0, j = 0;
-    while (src[i] && j < dest_size - 1) {
-        switch (src[i]) {
-        case '"':
-            if (j < dest_size - 2) { dest[j++] = '\\'; dest[j++] = '"'; }
-            break;
-        case '\\':
-            if (j < dest_size - 2) { dest[j++] = '\\'; dest[j++] = '\\'; }
-            break;
-        case '\n':
-            if (j < dest_size - 2) { dest[j++] = '\\'; dest[j++] = 'n'; }
-            break;
-        case '\r':
-            if (j < dest_size - 2) { dest[j++] = '\\'; dest[j++] = 'r'; }
-            break;
-        case '\t':
-            if (j < dest_size - 2) { dest[j++] = '\\'; dest[j++] = 't'; }
-            break;
-        default:
-            dest[j++] = src[i];
+    const unsigned char *p;
+    size_t j = 0;
+
+    for (p = (const unsigned char *)src; *p && j < dest_size - 1; p++) {
+        char esc = 0;
+        switch (*p) {
+        case '"':  esc = '"';  break;
+        case '\\': esc = '\\'; break;
+        case '\n': esc = 'n';  break;
+        case '\r': esc = 'r';  break;
+        case '\t': esc = 't';  break;
+        case '\b': esc = 'b';  break;
+        case '\f': esc = 'f';  break;
+        default:   break;
+        }
+
+        if (esc) {
+            if (j + 2 >= dest_size) break;
+            dest[j++] = '\\';
+            dest[j++] = esc;
+        } else if (*p < 0x20) {
+            /* Remaining control characters must be \u-escaped */
+            if (j + 6 >= dest_size) break;
+            snprintf(dest + j, 7, "\\u%04x", *p);
+            j += 6;
+        } else {
+            dest[j++] = (char)*p;
         }
-        i++;
     }
     dest[j] = '\0';
 }
@@ -83,7 +91,6 @@ static void machine_init(void *context)
 {
     (void)context;
     setvbuf(stdout, NULL, _IOLBF, 0);
-    setvbuf(stdin, NULL, _IOLBF, 0);
     start_time = time(NULL);
 }
 
@@ -97,11 +104,13 @@ static void machine_display_message(void *context, const char *from_username,
                                     const char *from_ip, const char *content)
 {
     char timestamp[32];
+    char escaped_name[128];
     char escaped_content[512];
     char json[1024];
     (void)context;
 
     get_timestamp(timestamp, sizeof(timestamp));
+    json_escape(escaped_name, from_username, sizeof(escaped_name));
     json_escape(escaped_content, content, sizeof(escaped_content));
 
     pthread_mutex_lock(&history_mutex);
@@ -122,7 +131,7 @@ static void machine_display_message(void *context, const char *from_username,
              "{\"type\":\"event\",\"event\":\"message\",\"timestamp\":\"%s\","
              "\"data\":{\"from\":{\"username\":\"%s\",\"ip\":\"%s\"},"
              "\"content\":\"%s\",\"message_id\":\"msg_%u\"}}",
-             timestamp, from_username, from_ip, escaped_content, stats.messages_received);
+             timestamp, escaped_name, from_ip, escaped_content, stats.messages_received);
 
     json_output(json);
 }
@@ -131,6 +140,12 @@ static void machine_display_app_message(void *context, const char *format, va_li
 {
     char buffer[1024];
     (void)context;
+
+    /* Only logged at debug level, so skip the formatting when it's off */
+    if (!is_debug_enabled()) {
+        return;
+    }
+
     vsnprintf(buffer, sizeof(buffer), format, args);
     CLOG_DEBUG("App message: %s", buffer);
 }
@@ -139,16 +154,18 @@ static void machine_display_error(void *context, const char *format, va_list arg
 {
     char timestamp[32];
     char error_msg[512];
+    char escaped_msg[512];
     char json[1024];
     (void)context;
 
     get_timestamp(timestamp, sizeof(timestamp));
     vsnprintf(error_msg, sizeof(error_msg), format, args);
+    json_escape(escaped_msg, error_msg, sizeof(escaped_msg));
 
     snprintf(json, sizeof(json),
              "{\"type\":\"error\",\"timestamp\":\"%s\","
              "\"error\":{\"code\":\"INTERNAL_ERROR\",\"message\":\"%s\"}}",
-             timestamp, error_msg);
+             timestamp, escaped_msg);
 
     json_output(json);
 }
@@ -159,6 +176,7 @@ static void machine_display_peer_list(void *context, app_state_t *state)
     char json[4096];
     char peers_json[3072];
     int first = 1;
+    size_t peers_len = 1;
     int i, total, connected_num;
     (void)context;
 
@@ -171,17 +189,27 @@ static void machine_display_peer_list(void *context, app_state_t *state)
     for (i = 0; i < total; i++) {
         PT_Peer *peer = PT_GetPeer(state->pt_ctx, i);
         if (peer && PT_GetPeerState(peer) == PT_PEER_CONNECTED) {
-            char peer_json[256];
+            char escaped_name[128];
+            int written;
             connected_num++;
 
-            snprintf(peer_json, sizeof(peer_json),
-                     "%s{\"id\":%d,\"username\":\"%s\",\"ip\":\"%s\",\"status\":\"connected\"}",
-                     first ? "" : ",",
-                     connected_num,
-                     PT_PeerName(peer),
-                     PT_PeerAddress(peer));
+            json_escape(escaped_name, PT_PeerName(peer), sizeof(escaped_name));
 
-            strcat(peers_json, peer_json);
+            /* Leave room for the closing ']'; stop listing once full */
+            written = snprintf(peers_json + peers_len, sizeof(peers_json) - peers_len,
+                               "%s{\"id\":%d,\"username\":\"%s\",\"ip\":\"%s\",\"status\":\"connected\"}",
+                               first ? "" : ",",
+                               connected_num,
+                               escaped_name,
+                               PT_PeerAddress(peer));
+
+            if (written < 0 || peers_len + (size_t)written >= sizeof(peers_json) - 2) {
+                peers_json[peers_len] = '\0';
+                connected_num--;  /* count only the peers actually listed */
+                CLOG_WARN("Peer list truncated at %d peers", connected_num);
+                break;
+            }
+            peers_len += (size_t)written;
             first = 0;
         }
     }
@@ -339,8 +367,10 @@ static void machine_handle_command_start(void *context, const char *command)
         id_end = strchr(id_start, ' ');
         id_len = id_end ? (size_t)(id_end - id_start) : strlen(id_start);
         if (id_len < sizeof(current_command_id)) {
-            strncpy(current_command_id, id_start, id_len);
-            current_command_id[id_len] = '\0';
+            char raw_id[sizeof(current_command_id)];
+            strncpy(raw_id, id_start, id_len);
+            raw_id[id_len] = '\0';
+            json_escape(current_command_id, raw_id, sizeof(current_command_id));
         }
     } else {
         current_command_id[0] = '\0';
@@ -356,15 +386,17 @@ static void machine_handle_command_complete(void *context)
 static void machine_notify_startup(void *context, const char *username)
 {
     char timestamp[32];
+    char escaped_name[128];
     char json[256];
     (void)context;
 
     get_timestamp(timestamp, sizeof(timestamp));
+    json_escape(escaped_name, username, sizeof(escaped_name));
 
     snprintf(json, sizeof(json),
              "{\"type\":\"start\",\"version\":\"2.0\","
              "\"username\":\"%s\",\"timestamp\":\"%s\"}",
-             username, timestamp);
+             escaped_name, timestamp);
 
     json_output(json);
 }
@@ -400,12 +432,14 @@ static void machine_notify_ready(void *context)
 static void machine_notify_status(void *context, app_state_t *state)
 {
     char timestamp[32];
+    char escaped_name[128];
     char json[1024];
     int active_peers;
     time_t uptime;
     (void)context;
 
     get_timestamp(timestamp, sizeof(timestamp));
+    json_escape(escaped_name, state->username, sizeof(escaped_name));
     uptime = time(NULL) - start_time;
     active_peers = bridge_get_peer_count(state);
 
@@ -418,7 +452,7 @@ static void machine_notify_status(void *context, app_state_t *state)
              "\"messages_sent\":%u,\"messages_received\":%u,"
              "\"broadcasts_sent\":%u,\"active_peers\":%d}}}",
              current_command_id[0] ? current_command_id : "null",
-             timestamp, (long)uptime, state->username,
+             timestamp, (long)uptime, escaped_name,
              stats.messages_sent, stats.messages_received,
              stats.broadcasts_sent, active_peers);
 
@@ -473,19 +507,21 @@ static void machine_notify_history(void *context, int count)
         int idx = (start_idx + i) % MAX_HISTORY;
         if (message_history[idx].timestamp > 0) {
             char msg_timestamp[32];
+            char escaped_name[128];
             char escaped_content[512];
             char msg_json[1024];
             int written;
             const struct tm *tm_info = gmtime(&message_history[idx].timestamp);
             strftime(msg_timestamp, sizeof(msg_timestamp), "%Y-%m-%dT%H:%M:%SZ", tm_info);
 
+            json_escape(escaped_name, message_history[idx].from_username, sizeof(escaped_name));
             json_escape(escaped_content, message_history[idx].content, sizeof(escaped_content));
 
             written = snprintf(msg_json, sizeof(msg_json),
                                "%s{\"timestamp\":\"%s\",\"from\":\"%s\",\"content\":\"%s\"}",
                                first ? "" : ",",
                                msg_timestamp,
-                               message_history[idx].from_username,
+                               escaped_name,
                                escaped_content);
 
             if (written > 0 && history_len + (size_t)written < sizeof(history_json) - 2) {